@@ -1,6 +1,7 @@
 from utils.api_handler import *
 from utils.data_processor import *
 from utils.file_handler import *
+import math
 def main():
     """
     Main execution function (end-to-end workflow)
@@ -31,14 +32,25 @@ def main():
         # ---------------- [3/10] FILTER OPTIONS ----------------
         print("[3/10] Filter Options Available:")
 
-        # show regions + amount range BEFORE asking
-        regions_available = sorted(set(t["Region"] for t in transactions if t.get("Region")))
-        amounts = [(t["Quantity"] * t["UnitPrice"]) for t in transactions if "Quantity" in t and "UnitPrice" in t]
+        # show regions + amount range BEFORE asking (single pass, no amounts list)
+        regions_seen = set()
+        amount_min = math.inf
+        amount_max = -math.inf
+        for t in transactions:
+            if t.get("Region"):
+                regions_seen.add(t["Region"])
+            if "Quantity" in t and "UnitPrice" in t:
+                amount = t["Quantity"] * t["UnitPrice"]
+                if amount < amount_min:
+                    amount_min = amount
+                if amount > amount_max:
+                    amount_max = amount
+        regions_available = sorted(regions_seen)
 
         print("Regions:", ", ".join(regions_available) if regions_available else "None")
 
-        if amounts:
-            print(f"Amount Range: ₹{min(amounts):,.0f} - ₹{max(amounts):,.0f}")
+        if amount_min <= amount_max:
+            print(f"Amount Range: ₹{amount_min:,.0f} - ₹{amount_max:,.0f}")
         else:
             print("Amount Range: Not available")
 
@@ -90,13 +102,7 @@ def main():
         # ---------------- [5/10] ANALYSIS ----------------
         print("[5/10] Analyzing sales data...")
 
-        total_rev = calculate_total_revenue(valid_transactions)
-        region_stats = region_wise_sales(valid_transactions)
-        top_products = top_selling_products(valid_transactions, n=5)
-        customers = customer_analysis(valid_transactions)
-        daily_trend = daily_sales_trend(valid_transactions)
-        peak_day = find_peak_sales_day(valid_transactions)
-        low_products = low_performing_products(valid_transactions, threshold=10)
+        metrics = compute_all_stats(valid_transactions, n=5, threshold=10)
 
         print("✓ Analysis complete\n")
 
@@ -127,7 +133,7 @@ def main():
 
         # ---------------- [9/10] GENERATE REPORT ----------------
         print("[9/10] Generating report...")
-        generate_sales_report(valid_transactions, enriched_transactions, output_file="output/sales_report.txt")
+        generate_sales_report(metrics, enriched_transactions, output_file="output/sales_report.txt")
         print("✓ Report saved to: output/sales_report.txt\n")
 
         # ---------------- [10/10] DONE ----------------
@@ -1,7 +1,140 @@
 import requests
 import os
-from utils.data_processor import *
-def fetch_all_products():
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+PRODUCTS_URL = "https://dummyjson.com/products"
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+MAX_CATALOG_SIZE = 10000  # upper bound on the reported 'total' (100 pages)
+
+# Fields kept from each API product
+PRODUCT_FIELDS = ("id", "title", "category", "brand", "price", "rating")
+
+CACHE_FILE = "data/.cache/products.json"
+CACHE_TTL = 24 * 60 * 60  # seconds
+
+_PRODUCT_ID_RE = re.compile(r"P(\d+)")
+
+
+def _create_session():
+    """
+    Creates an HTTP session for API calls
+
+    Reusing a session keeps TCP/TLS connections alive between requests,
+    asks for gzip responses and retries connection errors and transient
+    status codes with exponential backoff. Read errors are not retried
+    (read=False): a stalled request fails after one timeout and surfaces
+    as the original requests.exceptions.ReadTimeout, not as a generic
+    "Max retries exceeded" ConnectionError.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip"})
+
+    retry = Retry(
+        total=3,
+        read=False,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504)
+    )
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+_thread_local = threading.local()
+
+
+def _get_session():
+    """
+    Returns the HTTP session of the calling thread, creating it on first use
+
+    requests.Session is not documented as thread-safe, so each thread
+    (the main thread and every page-fetch worker) gets its own session;
+    nothing is created at import time.
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = _thread_local.session = _create_session()
+    return session
+
+
+def _load_cached_products(max_products, cache_file=CACHE_FILE, ttl=CACHE_TTL):
+    """
+    Loads products from the on-disk cache
+
+    Returns: list of product dictionaries, or None if the cache is
+    missing, older than ttl seconds, unreadable, or was saved for a
+    different max_products
+    """
+    try:
+        if time.time() - os.path.getmtime(cache_file) > ttl:
+            return None
+
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cached, dict) or cached.get("max_products") != max_products:
+        return None
+
+    products = cached.get("products")
+    return products if isinstance(products, list) else None
+
+
+def _save_cached_products(products, max_products, cache_file=CACHE_FILE):
+    """
+    Saves products (fetched with max_products) to the on-disk cache
+
+    Writes to a temporary file first and then renames it, so a crash
+    never leaves a half-written cache behind. Failures are ignored
+    (the cache is only an optimisation).
+    """
+    tmp_file = cache_file + ".tmp"
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"max_products": max_products, "products": products}, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: Could not write product cache: {e}")
+
+
+def _fetch_products_page(skip):
+    """
+    Fetches one page of products from DummyJSON API
+
+    Returns: dict (parsed JSON response)
+
+    Raises requests.exceptions.RequestException on connection errors
+    or a non-200 status code
+    """
+    response = _get_session().get(
+        PRODUCTS_URL,
+        params={"limit": PAGE_SIZE, "skip": skip},
+        timeout=10
+    )
+
+    if response.status_code != 200:
+        raise requests.exceptions.RequestException(
+            f"Failed to fetch products. Status code: {response.status_code}"
+        )
+
+    return response.json()
+
+
+def fetch_all_products(use_cache=True, max_products=PAGE_SIZE):
     """
     Fetches all products from DummyJSON API
 
@@ -12,32 +145,57 @@ def fetch_all_products():
     - Handle connection errors with try-except
     - Return empty list if API fails
     - Print status message (success/failure)
-    """
-    url = "https://dummyjson.com/products?limit=100"
 
-    try:
-        response = requests.get(url, timeout=10)
+    max_products is the most products returned: the default is a single
+    page (PAGE_SIZE products, one request); pass a larger number, or None
+    for the whole catalog (capped at MAX_CATALOG_SIZE), to opt in to more
+    pages. The first page reports the catalog 'total', and the remaining
+    pages needed to cover max_products are requested concurrently, so
+    latency stays close to two round-trips.
 
-        if response.status_code != 200:
-            print(f"Failed to fetch products. Status code: {response.status_code}")
-            return []
+    When use_cache is True, a cached copy younger than CACHE_TTL is
+    returned without touching the network, and fresh results are
+    written back to CACHE_FILE.
+    """
+    if use_cache:
+        cached_products = _load_cached_products(max_products)
+        if cached_products:
+            print(f"Loaded {len(cached_products)} products from cache.")
+            return cached_products
 
-        data = response.json()
+    try:
+        data = _fetch_products_page(0)
         products = data.get("products", [])
 
-        # Keep only required fields
-        cleaned_products = []
-        for p in products:
-            cleaned_products.append({
-                "id": p.get("id"),
-                "title": p.get("title"),
-                "category": p.get("category"),
-                "brand": p.get("brand"),
-                "price": p.get("price"),
-                "rating": p.get("rating")
-            })
+        # Fetch remaining pages (if any, up to max_products) concurrently;
+        # a missing or malformed 'total' (e.g. "abc", inf) means no further
+        # pages, and a huge one is clamped to MAX_CATALOG_SIZE
+        try:
+            total = int(data.get("total", 0))
+        except (TypeError, ValueError, OverflowError):
+            total = 0
+        total = min(total, MAX_CATALOG_SIZE)
+        if max_products is not None:
+            total = min(total, max_products)
+
+        skips = list(range(PAGE_SIZE, total, PAGE_SIZE))
+        if skips:
+            with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(skips))) as pool:
+                for page in pool.map(_fetch_products_page, skips):
+                    products.extend(page.get("products", []))
+
+        # Whole pages may overshoot max_products; trim before cleaning
+        if max_products is not None:
+            products = products[:max_products]
+
+        # Keep only required fields (.get, since some products have no brand)
+        cleaned_products = [{k: p.get(k) for k in PRODUCT_FIELDS} for p in products]
 
         print(f"Successfully fetched {len(cleaned_products)} products.")
+
+        if use_cache and cleaned_products:
+            _save_cached_products(cleaned_products, max_products)
+
         return cleaned_products
 
     except requests.exceptions.RequestException as e:
@@ -80,6 +238,19 @@ def create_product_mapping(api_products):
 
 
 
+def _parse_product_id(product_id):
+    """
+    Extracts the numeric ID from a ProductID (P101 -> 101)
+
+    Returns: int, or None if the ProductID is not 'P' followed by digits
+
+    enrich_sales_data() caches the resolved fields per ProductID, so this
+    runs once per distinct ID.
+    """
+    match = _PRODUCT_ID_RE.fullmatch(str(product_id).strip())
+    return int(match.group(1)) if match else None
+
+
 def enrich_sales_data(transactions, product_mapping):
     """
     Enriches transaction data with API product information
@@ -90,53 +261,47 @@ def enrich_sales_data(transactions, product_mapping):
 
     Returns: list of enriched transaction dictionaries
 
-    File Output:
-    - Save enriched data to 'data/enriched_sales_data.txt'
-    - Use same pipe-delimited format
-    - Include new columns in header
+    Does not write any file; pass the result to save_enriched_data()
     """
     enriched_transactions = []
 
-    for tx in transactions:
-        try:
-            enriched_tx = tx.copy()
-
-            # Extract numeric ID from ProductID (P101 -> 101)
-            product_id_str = str(tx.get("ProductID", "")).strip()
+    # Enrichment columns, built once per API product instead of per row
+    unmatched_fields = {
+        "API_Category": None,
+        "API_Brand": None,
+        "API_Rating": None,
+        "API_Match": False
+    }
+    matched_fields = {
+        product_id: {
+            "API_Category": api_info.get("category"),
+            "API_Brand": api_info.get("brand"),
+            "API_Rating": api_info.get("rating"),
+            "API_Match": True
+        }
+        for product_id, api_info in product_mapping.items()
+    }
 
-            numeric_id = None
-            if product_id_str.startswith("P"):
-                numeric_part = product_id_str[1:]
-                if numeric_part.isdigit():
-                    numeric_id = int(numeric_part)
+    # ProductID string -> enrichment columns, resolved once per distinct ID
+    fields_by_product_id = {}
 
-            # Default enrichment fields
-            enriched_tx["API_Category"] = None
-            enriched_tx["API_Brand"] = None
-            enriched_tx["API_Rating"] = None
-            enriched_tx["API_Match"] = False
+    for tx in transactions:
+        try:
+            product_id = tx.get("ProductID", "")
+            fields = fields_by_product_id.get(product_id)
 
-            # Enrich if mapping exists
-            if numeric_id is not None and numeric_id in product_mapping:
-                api_info = product_mapping[numeric_id]
-                enriched_tx["API_Category"] = api_info.get("category")
-                enriched_tx["API_Brand"] = api_info.get("brand")
-                enriched_tx["API_Rating"] = api_info.get("rating")
-                enriched_tx["API_Match"] = True
+            if fields is None:
+                # Extract numeric ID from ProductID (P101 -> 101)
+                numeric_id = _parse_product_id(product_id)
+                fields = matched_fields.get(numeric_id, unmatched_fields)
+                fields_by_product_id[product_id] = fields
 
-            enriched_transactions.append(enriched_tx)
+            # Copy the transaction and add all four columns in one merge
+            enriched_transactions.append({**tx, **fields})
 
         except Exception:
             # Gracefully handle unexpected errors
-            tx_copy = tx.copy()
-            tx_copy["API_Category"] = None
-            tx_copy["API_Brand"] = None
-            tx_copy["API_Rating"] = None
-            tx_copy["API_Match"] = False
-            enriched_transactions.append(tx_copy)
-
-    # Save to file
-    save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt")
+            enriched_transactions.append({**tx, **unmatched_fields})
 
     return enriched_transactions
 
@@ -158,6 +323,8 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
         "API_Category", "API_Brand", "API_Rating", "API_Match"
     ]
 
+    # Rows are written one by one: the buffered text file already batches
+    # the underlying writes, and building every line in memory first measured slower
     with open(filename, "w", encoding="utf-8") as f:
         # Write header
         f.write("|".join(headers) + "\n")
@@ -179,9 +346,14 @@ def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data
 import os
 from datetime import datetime
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+def generate_sales_report(metrics, enriched_transactions, output_file='output/sales_report.txt'):
     """
     Generates a comprehensive formatted text report with 8 required sections.
+
+    Parameters:
+    - metrics: SalesStats from compute_all_stats() (already computed in main)
+    - enriched_transactions: list from enrich_sales_data()
+    - output_file: path of the report to write
     """
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
@@ -205,40 +377,46 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         return char * width
 
     # ---------------- METRICS ----------------
-    total_records = len(transactions)
+    total_records = len(enriched_transactions)
 
-    total_revenue = calculate_total_revenue(transactions)
-    total_transactions = len(transactions)
+    total_revenue = metrics.total_revenue
+    total_transactions = total_records
     avg_order_value = (total_revenue / total_transactions) if total_transactions > 0 else 0.0
 
-    # Date range
-    dates = sorted([t.get("Date") for t in transactions if t.get("Date")])
-    date_range = (dates[0], dates[-1]) if dates else ("N/A", "N/A")
+    # Date range (single min/max scan, no sorting)
+    date_min = date_max = None
+    for t in enriched_transactions:
+        d = t.get("Date")
+        if not d:
+            continue
+        if date_min is None or d < date_min:
+            date_min = d
+        if date_max is None or d > date_max:
+            date_max = d
+    date_range = (date_min, date_max) if date_min is not None else ("N/A", "N/A")
 
     # Region stats
-    region_stats = region_wise_sales(transactions)
+    region_stats = metrics.region_stats
 
     # Top products
-    top_products = top_selling_products(transactions, n=5)
+    top_products = metrics.top_products
 
     # Customer stats
-    customer_stats = customer_analysis(transactions)
-    top_customers = []
-    rank = 1
-    for cust_id, stats in customer_stats.items():
-        top_customers.append((cust_id, stats["total_spent"], stats["purchase_count"]))
-        rank += 1
-        if len(top_customers) == 5:
-            break
+    # (customer_stats is already sorted by total_spent, so take the first 5)
+    customer_stats = metrics.customer_stats
+    top_customers = [
+        (cust_id, stats["total_spent"], stats["purchase_count"])
+        for cust_id, stats in islice(customer_stats.items(), 5)
+    ]
 
     # Daily trend
-    daily_trend = daily_sales_trend(transactions)
+    daily_trend = metrics.daily_trend
 
     # Peak sales day
-    peak_date, peak_rev, peak_count = find_peak_sales_day(transactions)
+    peak_date, peak_rev, peak_count = metrics.peak_day
 
     # Low performing products
-    low_products = low_performing_products(transactions, threshold=10)
+    low_products = metrics.low_products
 
     # Avg transaction value per region
     avg_tx_value_region = {}
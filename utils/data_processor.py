@@ -1,3 +1,118 @@
+import heapq
+from collections import defaultdict, namedtuple
+from operator import itemgetter
+
+# Container for every analytics result, produced by compute_all_stats()
+SalesStats = namedtuple("SalesStats", [
+    "total_revenue", "region_stats", "top_products", "customer_stats",
+    "daily_trend", "peak_day", "low_products"
+])
+
+# Product ranking key: (TotalQuantity, TotalRevenue) of a product tuple
+_product_rank_key = itemgetter(1, 2)
+
+def _tx_amount(tx):
+    """
+    Amount of one transaction: the precomputed 'Amount' from
+    validate_and_filter() if present, else Quantity * UnitPrice
+    """
+    amount = tx.get("Amount")
+    if amount is None:
+        return tx["Quantity"] * tx["UnitPrice"]
+    return amount
+
+# Result builders shared by the per-metric functions and compute_all_stats():
+# each turns one positional accumulator dict into the published result,
+# so sorting, tie-breaking and percentages are defined in one place
+
+def _region_stats(region_acc, total_revenue):
+    """
+    Builds the region_wise_sales() result from {Region: [sales, count]}
+    """
+    # (every transaction has a Region, so total_revenue is the region total;
+    # the division is hoisted into a single scale factor)
+    pct_scale = 100.0 / total_revenue if total_revenue > 0 else 0.0
+    region_stats = {}
+    for region, (sales, count) in sorted(region_acc.items(), key=lambda x: x[1][0], reverse=True):
+        region_stats[region] = {
+            "total_sales": sales,
+            "transaction_count": count,
+            "percentage": sales * pct_scale
+        }
+    return region_stats
+
+def _product_list(product_acc):
+    """
+    Flattens {ProductName: [qty, revenue]} into
+    [(ProductName, TotalQuantity, TotalRevenue), ...] in first-seen order
+    """
+    return [(name, qty, revenue) for name, (qty, revenue) in product_acc.items()]
+
+def _top_products(products, n):
+    """
+    Top n of a _product_list() by (TotalQuantity, TotalRevenue), descending
+    """
+    return heapq.nlargest(n, products, key=_product_rank_key)
+
+def _low_products(products, threshold):
+    """
+    Products of a _product_list() with TotalQuantity < threshold, ascending
+    """
+    return sorted((p for p in products if p[1] < threshold), key=_product_rank_key)
+
+def _customer_stats(customer_acc):
+    """
+    Builds the customer_analysis() result from
+    {CustomerID: [spent, count, products_set]}
+    """
+    customer_stats = {}
+    for customer_id, (spent, count, bought) in sorted(customer_acc.items(), key=lambda x: x[1][0], reverse=True):
+        customer_stats[customer_id] = {
+            "total_spent": spent,
+            "purchase_count": count,
+            "products_bought": sorted(bought),
+            "avg_order_value": spent / count if count > 0 else 0.0
+        }
+    return customer_stats
+
+def _peak_day(daily_acc):
+    """
+    Picks the find_peak_sales_day() result from {Date: [revenue, count, ...]}
+
+    First-seen order breaks ties
+    """
+    if not daily_acc:
+        return (None, 0.0, 0)
+    peak_date, peak_acc = max(daily_acc.items(), key=lambda x: x[1][0])
+    return (peak_date, peak_acc[0], peak_acc[1])
+
+def _daily_trend(daily_acc):
+    """
+    Builds the daily_sales_trend() result from
+    {Date: [revenue, count, customers_set]}
+    """
+    daily_trend = {}
+    for date, (revenue, count, customers) in sorted(daily_acc.items(), key=lambda x: x[0]):
+        daily_trend[date] = {
+            "revenue": revenue,
+            "transaction_count": count,
+            "unique_customers": len(customers)
+        }
+    return daily_trend
+
+def _product_totals(transactions):
+    """
+    Aggregates quantity and revenue per ProductName in one pass
+
+    Returns: list of (ProductName, TotalQuantity, TotalRevenue) in first-seen order
+    """
+    product_acc = defaultdict(lambda: [0, 0.0])
+    for tx in transactions:
+        acc = product_acc[tx["ProductName"]]
+        acc[0] += tx["Quantity"]
+        acc[1] += _tx_amount(tx)
+    return _product_list(product_acc)
+
 def calculate_total_revenue(transactions):
     """
     Calculates total revenue from all transactions
@@ -7,18 +122,7 @@ def calculate_total_revenue(transactions):
     Expected Output: Single number representing sum of (Quantity * UnitPrice)
     Example: 1545000.50
     """
-    total = 0.0
-
-    for tx in transactions:
-        try:
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-            total += qty * price
-        except (KeyError, TypeError, ValueError):
-            # Skip any bad/incomplete transaction records
-            continue
-
-    return total
+    return sum(map(_tx_amount, transactions), 0.0)
 
 def region_wise_sales(transactions):
     """
@@ -31,7 +135,7 @@ def region_wise_sales(transactions):
         'North': {
             'total_sales': 450000.0,
             'transaction_count': 15,
-            'percentage': 29.13
+            'percentage': 29.12620416627697
         },
         'South': {...},
         ...
@@ -43,48 +147,15 @@ def region_wise_sales(transactions):
     - Calculate percentage of total sales
     - Sort by total_sales in descending order
     """
-    region_stats = {}
-    grand_total = 0.0
-
-    # 1) Compute totals + counts
+    total_revenue = 0.0
+    region_acc = defaultdict(lambda: [0.0, 0])
     for tx in transactions:
-        try:
-            region = str(tx["Region"]).strip()
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-        except (KeyError, TypeError, ValueError):
-            continue
-
-        if not region:
-            continue
-
-        amount = qty * price
-        grand_total += amount
-
-        if region not in region_stats:
-            region_stats[region] = {"total_sales": 0.0, "transaction_count": 0}
-
-        region_stats[region]["total_sales"] += amount
-        region_stats[region]["transaction_count"] += 1
-
-    # 2) Add percentage
-    for region in region_stats:
-        if grand_total > 0:
-            pct = (region_stats[region]["total_sales"] / grand_total) * 100
-        else:
-            pct = 0.0
-        region_stats[region]["percentage"] = round(pct, 2)
-
-    # 3) Sort by total_sales (descending)
-    region_stats_sorted = dict(
-        sorted(
-            region_stats.items(),
-            key=lambda x: x[1]["total_sales"],
-            reverse=True
-        )
-    )
-
-    return region_stats_sorted
+        amount = _tx_amount(tx)
+        total_revenue += amount
+        acc = region_acc[tx["Region"]]
+        acc[0] += amount
+        acc[1] += 1
+    return _region_stats(region_acc, total_revenue)
 
 def top_selling_products(transactions, n=5):
     """
@@ -106,36 +177,7 @@ def top_selling_products(transactions, n=5):
     - Sort by TotalQuantity descending
     - Return top n products
     """
-    product_summary = {}
-
-    for tx in transactions:
-        try:
-            name = str(tx["ProductName"]).strip()
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-        except (KeyError, TypeError, ValueError):
-            continue
-
-        if not name:
-            continue
-
-        revenue = qty * price
-
-        if name not in product_summary:
-            product_summary[name] = {"total_qty": 0, "total_revenue": 0.0}
-
-        product_summary[name]["total_qty"] += qty
-        product_summary[name]["total_revenue"] += revenue
-
-    # Convert to list of tuples
-    result = []
-    for name, stats in product_summary.items():
-        result.append((name, stats["total_qty"], stats["total_revenue"]))
-
-    # Sort by quantity descending (if tie, sort by revenue descending)
-    result.sort(key=lambda x: (x[1], x[2]), reverse=True)
-
-    return result[:n]
+    return _top_products(_product_totals(transactions), n)
 
 def customer_analysis(transactions):
     """
@@ -148,7 +190,7 @@ def customer_analysis(transactions):
         'C001': {
             'total_spent': 95000.0,
             'purchase_count': 3,
-            'avg_order_value': 31666.67,
+            'avg_order_value': 31666.666666666668,
             'products_bought': ['Laptop', 'Mouse', 'Keyboard']
         },
         'C002': {...},
@@ -162,54 +204,13 @@ def customer_analysis(transactions):
     - List unique products bought
     - Sort by total_spent descending
     """
-    customer_stats = {}
-
-    # 1) Aggregate totals, counts, and unique products
+    customer_acc = defaultdict(lambda: [0.0, 0, set()])
     for tx in transactions:
-        try:
-            customer_id = str(tx["CustomerID"]).strip()
-            product_name = str(tx["ProductName"]).strip()
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-        except (KeyError, TypeError, ValueError):
-            continue
-
-        if not customer_id:
-            continue
-
-        amount = qty * price
-
-        if customer_id not in customer_stats:
-            customer_stats[customer_id] = {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()
-            }
-
-        customer_stats[customer_id]["total_spent"] += amount
-        customer_stats[customer_id]["purchase_count"] += 1
-
-        if product_name:
-            customer_stats[customer_id]["products_bought"].add(product_name)
-
-    # 2) Calculate avg order value + convert set -> sorted list
-    for cust_id, stats in customer_stats.items():
-        count = stats["purchase_count"]
-        total = stats["total_spent"]
-
-        stats["avg_order_value"] = round(total / count, 2) if count > 0 else 0.0
-        stats["products_bought"] = sorted(list(stats["products_bought"]))
-
-    # 3) Sort by total_spent descending
-    customer_stats_sorted = dict(
-        sorted(
-            customer_stats.items(),
-            key=lambda x: x[1]["total_spent"],
-            reverse=True
-        )
-    )
-
-    return customer_stats_sorted
+        acc = customer_acc[tx["CustomerID"]]
+        acc[0] += _tx_amount(tx)
+        acc[1] += 1
+        acc[2].add(tx["ProductName"])
+    return _customer_stats(customer_acc)
 
 def daily_sales_trend(transactions):
     """
@@ -235,44 +236,13 @@ def daily_sales_trend(transactions):
     - Count unique customers per day
     - Sort chronologically
     """
-    daily_stats = {}
-
-    # 1) Group and aggregate
+    daily_acc = defaultdict(lambda: [0.0, 0, set()])
     for tx in transactions:
-        try:
-            date = str(tx["Date"]).strip()
-            customer_id = str(tx["CustomerID"]).strip()
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-        except (KeyError, TypeError, ValueError):
-            continue
-
-        if not date:
-            continue
-
-        revenue = qty * price
-
-        if date not in daily_stats:
-            daily_stats[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0,
-                "unique_customers": set()
-            }
-
-        daily_stats[date]["revenue"] += revenue
-        daily_stats[date]["transaction_count"] += 1
-
-        if customer_id:
-            daily_stats[date]["unique_customers"].add(customer_id)
-
-    # 2) Convert unique customer set -> count
-    for date in daily_stats:
-        daily_stats[date]["unique_customers"] = len(daily_stats[date]["unique_customers"])
-
-    # 3) Sort chronologically (works for YYYY-MM-DD format)
-    daily_stats_sorted = dict(sorted(daily_stats.items(), key=lambda x: x[0]))
-
-    return daily_stats_sorted
+        acc = daily_acc[tx["Date"]]
+        acc[0] += _tx_amount(tx)
+        acc[1] += 1
+        acc[2].add(tx["CustomerID"])
+    return _daily_trend(daily_acc)
 
 def find_peak_sales_day(transactions):
     """
@@ -283,33 +253,12 @@ def find_peak_sales_day(transactions):
     Expected Output Format:
     ('2024-12-15', 185000.0, 12)
     """
-    daily_totals = {}
-
+    daily_acc = defaultdict(lambda: [0.0, 0])
     for tx in transactions:
-        try:
-            date = str(tx["Date"]).strip()
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-        except (KeyError, TypeError, ValueError):
-            continue
-
-        if not date:
-            continue
-
-        revenue = qty * price
-
-        if date not in daily_totals:
-            daily_totals[date] = {"revenue": 0.0, "count": 0}
-
-        daily_totals[date]["revenue"] += revenue
-        daily_totals[date]["count"] += 1
-
-    if not daily_totals:
-        return (None, 0.0, 0)
-
-    peak_date, peak_data = max(daily_totals.items(), key=lambda x: x[1]["revenue"])
-
-    return (peak_date, peak_data["revenue"], peak_data["count"])
+        acc = daily_acc[tx["Date"]]
+        acc[0] += _tx_amount(tx)
+        acc[1] += 1
+    return _peak_day(daily_acc)
 
 def low_performing_products(transactions, threshold=10):
     """
@@ -329,35 +278,83 @@ def low_performing_products(transactions, threshold=10):
     - Include total quantity and revenue
     - Sort by TotalQuantity ascending
     """
-    product_summary = {}
+    return _low_products(_product_totals(transactions), threshold)
 
-    # Aggregate quantity + revenue per product
-    for tx in transactions:
-        try:
-            name = str(tx["ProductName"]).strip()
-            qty = int(tx["Quantity"])
-            price = float(tx["UnitPrice"])
-        except (KeyError, TypeError, ValueError):
-            continue
+def compute_all_stats(transactions, n=5, threshold=10):
+    """
+    Computes all sales analytics in a single pass over transactions
 
-        if not name:
-            continue
+    Returns: SalesStats namedtuple with fields:
+    - total_revenue: same as calculate_total_revenue()
+    - region_stats: same as region_wise_sales()
+    - top_products: same as top_selling_products(n=n)
+    - customer_stats: same as customer_analysis()
+    - daily_trend: same as daily_sales_trend()
+    - peak_day: same as find_peak_sales_day()
+    - low_products: same as low_performing_products(threshold=threshold)
 
-        revenue = qty * price
+    Requirements:
+    - Iterate over transactions only once
+    - Update every accumulator inside the same loop
 
-        if name not in product_summary:
-            product_summary[name] = {"total_qty": 0, "total_revenue": 0.0}
+    Region percentage and customer avg_order_value are not rounded;
+    round only when formatting output
 
-        product_summary[name]["total_qty"] += qty
-        product_summary[name]["total_revenue"] += revenue
+    Use this when several metrics are needed; each per-metric function
+    runs its own loop over only the accumulators it returns, and all of
+    them share the result builders above
 
-    # Filter low-performing products
-    low_products = []
-    for name, stats in product_summary.items():
-        if stats["total_qty"] < threshold:
-            low_products.append((name, stats["total_qty"], stats["total_revenue"]))
+    Expects numeric Quantity/UnitPrice and non-empty Region/ProductName/
+    CustomerID/Date, as returned by parse_transactions() or
+    validate_and_filter(); the precomputed 'Amount' set by
+    validate_and_filter() is used when present, else Quantity * UnitPrice
+    """
+    total_revenue = 0.0
+    # Every reduction accumulates into a positional list ([sum, count, ...])
+    # under a single defaultdict probe; dicts are built once, after the loop
+    region_acc = defaultdict(lambda: [0.0, 0])
+    product_acc = defaultdict(lambda: [0, 0.0])
+    customer_acc = defaultdict(lambda: [0.0, 0, set()])
+    daily_acc = defaultdict(lambda: [0.0, 0, set()])
 
-    # Sort by TotalQuantity ascending (if tie, sort by revenue ascending)
-    low_products.sort(key=lambda x: (x[1], x[2]))
+    # 1) Single pass: unpack once (one C-level multi-key fetch), update all accumulators
+    get_fields = itemgetter("Quantity", "Region", "ProductName", "CustomerID", "Date")
 
-    return low_products
+    for tx in transactions:
+        qty, region, name, customer_id, date = get_fields(tx)
+        amount = tx.get("Amount")
+        if amount is None:
+            # Row did not come through validate_and_filter()
+            amount = qty * tx["UnitPrice"]
+        total_revenue += amount
+
+        acc = region_acc[region]
+        acc[0] += amount
+        acc[1] += 1
+
+        acc = product_acc[name]
+        acc[0] += qty
+        acc[1] += amount
+
+        acc = customer_acc[customer_id]
+        acc[0] += amount
+        acc[1] += 1
+        acc[2].add(name)
+
+        acc = daily_acc[date]
+        acc[0] += amount
+        acc[1] += 1
+        acc[2].add(customer_id)
+
+    # 2) Build every result from its accumulator (shared with the per-metric functions)
+    products = _product_list(product_acc)
+
+    return SalesStats(
+        total_revenue=total_revenue,
+        region_stats=_region_stats(region_acc, total_revenue),
+        top_products=_top_products(products, n),
+        customer_stats=_customer_stats(customer_acc),
+        daily_trend=_daily_trend(daily_acc),
+        peak_day=_peak_day(daily_acc),
+        low_products=_low_products(products, threshold)
+    )
@@ -1,3 +1,51 @@
+import codecs
+import os
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+
+@lru_cache(maxsize=4096)
+def _clean_product_name(product_name):
+    """
+    Replaces commas in a ProductName with spaces ("Mouse,Wireless" -> "Mouse Wireless")
+
+    Memoised: there are few distinct product names, so each one is
+    cleaned once rather than once per row
+    """
+    return product_name.replace(",", " ").strip()
+
+# Text fields every transaction must have (non-empty); Quantity and
+# UnitPrice are checked separately by their numeric conversion
+_get_text_fields = itemgetter(
+    "TransactionID", "Date", "ProductID", "ProductName", "CustomerID", "Region"
+)
+
+def _decode_bytes(data):
+    """
+    Decodes raw file bytes, sniffing a BOM before guessing
+
+    Returns: decoded text (str), or None if no candidate encoding fits
+
+    - UTF-8 BOM -> 'utf-8-sig', UTF-16 BOM (LE/BE) -> 'utf-16'
+    - otherwise strict 'utf-8', then 'cp1252', then 'latin-1'
+      (cp1252 rejects a few undefined bytes; latin-1 accepts anything)
+    """
+    if data.startswith(codecs.BOM_UTF8):
+        encodings_to_try = ["utf-8-sig"]
+    elif data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encodings_to_try = ["utf-16"]
+    else:
+        encodings_to_try = ["utf-8", "cp1252", "latin-1"]
+
+    for enc in encodings_to_try:
+        try:
+            return data.decode(enc)
+        except UnicodeDecodeError:
+            # Try next encoding
+            continue
+
+    return None
 
 def read_sales_data(filename):
     """
@@ -10,38 +58,44 @@ def read_sales_data(filename):
 
     Requirements:
     - Use 'with' statement
-    - Handle different encodings (try 'utf-8', 'latin-1', 'cp1252')
+    - Handle different encodings (BOM sniffing, then 'utf-8', 'cp1252', 'latin-1')
     - Handle FileNotFoundError with appropriate error message
     - Skip the header row
     - Remove empty lines
     """
-    encodings_to_try = ["utf-8", "latin-1", "cp1252"]
-
-    for enc in encodings_to_try:
-        try:
-            with open(filename, "r", encoding=enc) as f:
-                lines = f.readlines()
-
-            # Remove empty lines + strip newline spaces
-            lines = [line.strip() for line in lines if line.strip()]
+    # Read raw bytes once; only the decode is retried per encoding.
+    # The buffer is preallocated from the file size and filled by readinto()
+    try:
+        with open(filename, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > 0:
+                data = bytearray(size)
+                n = f.readinto(data)
+                del data[n:]  # in case the file shrank meanwhile
+                data += f.read()  # ...or grew past st_size
+            else:
+                # Size unknown (e.g. a pipe): fall back to a plain read
+                data = f.read()
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
+
+    text = _decode_bytes(data)
 
-            # Skip header row (first line)
-            if lines:
-                lines = lines[1:]
-
-            return lines
-
-        except UnicodeDecodeError:
-            # Try next encoding
-            continue
+    # If all encodings fail
+    if text is None:
+        print(f"Error: Could not read file '{filename}' due to encoding issues.")
+        return []
 
-        except FileNotFoundError:
-            print(f"Error: File '{filename}' not found.")
-            return []
+    # Split on real line endings only (\r\n, \r, \n) -- str.splitlines() would
+    # also break rows on \x0c, \x85, \u2028 etc. inside field values.
+    # Empty lines are removed in the same pass; per-field stripping is left
+    # to parse_transactions
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [line for line in text.split("\n") if line and not line.isspace()]
 
-    # If all encodings fail
-    print(f"Error: Could not read file '{filename}' due to encoding issues.")
-    return []
+    # Skip header row (first line)
+    return lines[1:]
 
 def parse_transactions(raw_lines):
     """
@@ -59,14 +113,22 @@ def parse_transactions(raw_lines):
     - Convert UnitPrice to float
     - Skip rows with incorrect number of fields
     """
-    transactions = []
+    return list(iter_transactions(raw_lines))
+
+def iter_transactions(raw_lines):
+    """
+    Generator version of parse_transactions()
+
+    Yields one clean transaction dictionary at a time, so a pipeline like
+    validate_and_filter(iter_transactions(lines)) never holds the full
+    list of parsed rows in memory
+    """
     expected_fields = 8
 
     for line in raw_lines:
-        if not line or not line.strip():
-            continue
-
-        parts = line.strip().split("|")
+        # No whole-line strip/empty check: every field is stripped below,
+        # and blank lines fail the field-count check anyway
+        parts = line.split("|")
 
         # Skip incorrect number of fields
         if len(parts) != expected_fields:
@@ -81,13 +143,23 @@ def parse_transactions(raw_lines):
         customer_id = parts[6].strip()
         region = parts[7].strip()
 
+        # Intern the heavily repeated IDs/regions: one shared string object
+        # per distinct value, and equality checks short-circuit on identity
+        product_id = sys.intern(product_id)
+        customer_id = sys.intern(customer_id)
+        region = sys.intern(region)
+
         # Handle commas in ProductName (remove commas or replace with space)
         # Example: "Mouse,Wireless" -> "Mouse Wireless"
-        product_name = product_name.replace(",", " ").strip()
+        # (the "in" check keeps the common no-comma case allocation-free)
+        if "," in product_name:
+            product_name = _clean_product_name(product_name)
 
         # Handle commas in numeric fields (e.g., "1,500" -> "1500")
-        quantity_raw = quantity_raw.replace(",", "")
-        unit_price_raw = unit_price_raw.replace(",", "")
+        if "," in quantity_raw:
+            quantity_raw = quantity_raw.replace(",", "")
+        if "," in unit_price_raw:
+            unit_price_raw = unit_price_raw.replace(",", "")
 
         # Convert to correct types
         try:
@@ -96,7 +168,7 @@ def parse_transactions(raw_lines):
         except ValueError:
             continue
 
-        transactions.append({
+        yield {
             "TransactionID": transaction_id,
             "Date": date,
             "ProductID": product_id,
@@ -105,111 +177,131 @@ def parse_transactions(raw_lines):
             "UnitPrice": unit_price,
             "CustomerID": customer_id,
             "Region": region
-        })
+        }
 
-    return transactions
-
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, verbose=True):
     """
     Validates transactions and applies optional filters
 
     Parameters:
-    - transactions: list of transaction dictionaries
+    - transactions: list (or any iterable, e.g. iter_transactions()) of
+      transaction dictionaries; it is consumed in a single pass
     - region: filter by specific region (optional)
     - min_amount: minimum transaction amount (Quantity * UnitPrice) (optional)
     - max_amount: maximum transaction amount (optional)
+    - verbose: print available options and per-filter counts (default True);
+      pass False for batch/repeated calls, the same numbers are in filter_summary
 
     Returns: tuple (valid_transactions, invalid_count, filter_summary)
+
+    Valid transactions are updated in place (no copies): Quantity is set
+    to int, UnitPrice to float and an extra 'Amount' key (Quantity *
+    UnitPrice) is added, so the input dictionaries are modified too
     """
-    required_fields = [
-        "TransactionID", "Date", "ProductID", "ProductName",
-        "Quantity", "UnitPrice", "CustomerID", "Region"
-    ]
+    if region:
+        # Matches the interned Region strings from parse_transactions
+        region = sys.intern(region)
 
-    total_input = len(transactions)
+    total_input = 0
     invalid_count = 0
     valid_transactions = []
+    amount_min = None  # running range of valid amounts (no amounts list)
+    amount_max = None
+    region_index = defaultdict(list)  # Region -> valid transactions, in input order
 
     # ---------- VALIDATION ----------
     for tx in transactions:
-        # Check required fields exist and are not empty/None
-        missing = False
-        for field in required_fields:
-            if field not in tx or tx[field] is None or str(tx[field]).strip() == "":
-                missing = True
-                break
+        total_input += 1
 
-        if missing:
+        # Check required fields exist and are not empty/None
+        # (one C-level fetch for all text fields)
+        try:
+            values = _get_text_fields(tx)
+        except KeyError:
             invalid_count += 1
             continue
 
-        # ID format checks
-        if not str(tx["TransactionID"]).startswith("T"):
-            invalid_count += 1
-            continue
-        if not str(tx["ProductID"]).startswith("P"):
-            invalid_count += 1
-            continue
-        if not str(tx["CustomerID"]).startswith("C"):
+        if None in values or not all(str(v).strip() for v in values):
             invalid_count += 1
             continue
 
-        # Quantity and UnitPrice rules
+        # Missing/None/empty Quantity or UnitPrice fail the conversion
         try:
             qty = int(tx["Quantity"])
             price = float(tx["UnitPrice"])
-        except (ValueError, TypeError):
+        except (KeyError, ValueError, TypeError):
             invalid_count += 1
             continue
 
-        if qty <= 0 or price <= 0:
+        # ID format checks + Quantity and UnitPrice rules, as one condition
+        # (IDs are non-empty here; the isinstance guard makes a non-str ID
+        # count as invalid, after which s[0] is safe and cheaper than
+        # startswith for a one-character prefix)
+        transaction_id, _, product_id, _, customer_id, _ = values
+        is_valid = (
+            isinstance(transaction_id, str) and transaction_id[0] == "T"
+            and isinstance(product_id, str) and product_id[0] == "P"
+            and isinstance(customer_id, str) and customer_id[0] == "C"
+            and qty > 0
+            and price > 0
+        )
+        if not is_valid:
             invalid_count += 1
             continue
 
+        # Store coerced numbers + precomputed Amount so the aggregation
+        # functions can use them directly
+        amount = qty * price
+        tx["Quantity"] = qty
+        tx["UnitPrice"] = price
+        tx["Amount"] = amount
+
         valid_transactions.append(tx)
+        if amount_min is None or amount < amount_min:
+            amount_min = amount
+        if amount_max is None or amount > amount_max:
+            amount_max = amount
+        region_index[tx["Region"]].append(tx)
 
     # ---------- DISPLAY AVAILABLE OPTIONS ----------
-    regions_available = sorted(set(t["Region"] for t in valid_transactions if t.get("Region")))
-    print("Available Regions:", regions_available)
+    if verbose:
+        regions_available = sorted(region_index)
+        print("Available Regions:", regions_available)
 
-    # Amount range based on valid transactions
-    amounts = [(t["Quantity"] * t["UnitPrice"]) for t in valid_transactions]
-    if amounts:
-        print(f"Transaction Amount Range: {min(amounts):.2f} to {max(amounts):.2f}")
-    else:
-        print("Transaction Amount Range: No valid transactions found")
+        # Amount range based on valid transactions
+        if amount_min is not None:
+            print(f"Transaction Amount Range: {amount_min:.2f} to {amount_max:.2f}")
+        else:
+            print("Transaction Amount Range: No valid transactions found")
 
     # ---------- FILTERING ----------
     filtered_by_region = 0
     filtered_by_amount = 0
 
-    filtered = valid_transactions
+    has_amount_filter = min_amount is not None or max_amount is not None
 
-    # Region filter
+    # Normalise unset bounds to +/-inf once, so the per-row test is a
+    # single chained comparison with no None checks
+    lo = float("-inf") if min_amount is None else float(min_amount)
+    hi = float("inf") if max_amount is None else float(max_amount)
+
+    # Region filter is a bucket lookup in region_index (no scan)
+    filtered = valid_transactions
     if region:
-        before = len(filtered)
-        filtered = [t for t in filtered if t.get("Region") == region]
-        filtered_by_region = before - len(filtered)
-        print(f"After Region Filter ({region}): {len(filtered)} records")
+        filtered = region_index.get(region, [])
+        filtered_by_region = len(valid_transactions) - len(filtered)
+        if verbose:
+            print(f"After Region Filter ({region}): {len(filtered)} records")
 
-    # Amount filters
-    if min_amount is not None or max_amount is not None:
+    # Amount filter: one pass over the remaining rows, using the cached Amount
+    if has_amount_filter:
         before = len(filtered)
-
-        def amount_ok(t):
-            amt = t["Quantity"] * t["UnitPrice"]
-            if min_amount is not None and amt < min_amount:
-                return False
-            if max_amount is not None and amt > max_amount:
-                return False
-            return True
-
-        filtered = [t for t in filtered if amount_ok(t)]
+        filtered = [t for t in filtered if lo <= t["Amount"] <= hi]
         filtered_by_amount = before - len(filtered)
-
-        print(
-            f"After Amount Filter (min={min_amount}, max={max_amount}): {len(filtered)} records"
-        )
+        if verbose:
+            print(
+                f"After Amount Filter (min={min_amount}, max={max_amount}): {len(filtered)} records"
+            )
 
     filter_summary = {
         "total_input": total_input,